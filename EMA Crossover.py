@@ -1,10 +1,10 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from core import cross_indices, cross_signals, ema_np
+from market_data import FrameLoaderMixin, batch_chart_path, fetch_cached, finish_chart
 
-class EMACrossover:
-    def __init__(self, ticker, start_date, end_date, short_window=20, long_window=50):
+class EMACrossover(FrameLoaderMixin):
+    def __init__(self, ticker, start_date, end_date, short_window=20, long_window=50, data=None):
         self.ticker = ticker
         self.start_date = start_date
         self.end_date = end_date
@@ -12,39 +12,44 @@ class EMACrossover:
         self.long_window = long_window
         self.data = None
 
-        # Download the historical data
-        self.data = yf.download(ticker, start=start_date, end=end_date, progress=False)
+        # Download the historical data unless it was fetched up front
+        if data is None:
+            data = fetch_cached(ticker, start_date, end_date)
+        self.data = data.dropna(subset=['Close'])
         self.calculate_ema()
         self.generate_signals()
 
     def calculate_ema(self):
         """Calculate short-term and long-term EMAs."""
-        self.data['EMA_Short'] = self.data['Close'].ewm(span=self.short_window, adjust=False).mean()
-        self.data['EMA_Long'] = self.data['Close'].ewm(span=self.long_window, adjust=False).mean()
+        close = self.data['Close'].to_numpy(dtype=np.float64)
+        ema_short, ema_long = ema_np(close, (self.short_window, self.long_window))
+        self.data = self.data.assign(EMA_Short=ema_short, EMA_Long=ema_long)
 
     def generate_signals(self):
         """Generate buy/sell signals based on EMA crossover."""
-        self.data['Signal'] = 0.0
-        self.data['Signal'] = np.where(self.data['EMA_Short'] > self.data['EMA_Long'], 1.0, 0.0)
-        self.data['Crossover'] = self.data['Signal'].diff()
+        signal, crossover = cross_signals(self.data['EMA_Short'].to_numpy(), self.data['EMA_Long'].to_numpy())
+        self.data = self.data.assign(Signal=signal, Crossover=crossover)
 
-    def plot_results(self):
-        """Plot the results with buy/sell signals."""
-        plt.figure(figsize=(16, 9))
+    def plot_results(self, out_path=None):
+        """Plot the results with buy/sell signals, saving the chart to out_path instead of showing it if given."""
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(16, 9))
         plt.plot(self.data['Close'], label='Close Price', color='blue', lw=2.5, zorder=1)
         plt.plot(self.data['EMA_Short'], label=f'{self.short_window}-Day EMA', color='green', lw=1.5, linestyle='--',
                  zorder=2)
         plt.plot(self.data['EMA_Long'], label=f'{self.long_window}-Day EMA', color='red', lw=1.5, linestyle='--',
                  zorder=2)
 
+        dates = self.data.index.to_numpy()
+        close = self.data['Close'].to_numpy()
+        buy, sell = cross_indices(self.data['Signal'].to_numpy())
+
         # Mark buy signals with a small offset to be clearly visible
-        plt.scatter(self.data[self.data['Crossover'] == 1.0].index,
-                    self.data['Close'][self.data['Crossover'] == 1.0] * 1.01,  # offset slightly above the line
+        plt.scatter(dates[buy], close[buy] * 1.01,  # offset slightly above the line
                     marker='^', color='green', s=100, label='Buy Signal', zorder=3)
 
         # Mark sell signals with a small offset to be clearly visible
-        plt.scatter(self.data[self.data['Crossover'] == -1.0].index,
-                    self.data['Close'][self.data['Crossover'] == -1.0] * 0.99,  # offset slightly below the line
+        plt.scatter(dates[sell], close[sell] * 0.99,  # offset slightly below the line
                     marker='v', color='red', s=100, label='Sell Signal', zorder=3)
 
         plt.title(f'{self.ticker} EMA Crossover Strategy', fontsize=16)
@@ -53,9 +58,14 @@ class EMACrossover:
         plt.grid(color='gray', linestyle='--', linewidth=0.5, alpha=0.7)
         plt.legend(loc='upper left', fontsize=12, frameon=True, shadow=True)
         plt.tight_layout()
-        plt.show()
+        finish_chart(fig, out_path)
+
+
+def main():
+    # Example of running the strategy
+    ema_strategy = EMACrossover(ticker='AAPL', start_date='2018-03-24', end_date='2023-03-24')
+    ema_strategy.plot_results(batch_chart_path(f"{ema_strategy.ticker}_ema_crossover.png"))
 
 
-# Example of running the strategy
-ema_strategy = EMACrossover(ticker='AAPL', start_date='2018-03-24', end_date='2023-03-24')
-ema_strategy.plot_results()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,38 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from core import sma_np
+from market_data import FrameLoaderMixin, batch_chart_path, fetch_cached, finish_chart
 
 
-class FibonacciStockIndicator:
-    def __init__(self, ticker):
+class FibonacciStockIndicator(FrameLoaderMixin):
+    def __init__(self, ticker, data=None):
         """
         Initialize Fibonacci Stock Indicator with comprehensive data handling
         """
         # Retrieve stock data
         self.ticker = ticker
-        self.fetch_stock_data()
+        self.fetch_stock_data(data)
 
-    def fetch_stock_data(self):
+    @classmethod
+    def from_frame(cls, ticker, frame):
+        """
+        Build the indicator on an already downloaded price frame, skipping the fetch
+        """
+        return cls(ticker, data=frame)
+
+    def fetch_stock_data(self, data=None):
         """
         Fetch stock data with comprehensive error handling and logging
         """
         try:
-            # Download data for past 2 months
-            end_date = pd.Timestamp.now()
-            start_date = end_date - pd.DateOffset(months=2)
+            if data is None:
+                # Download data for past 2 months
+                end_date = pd.Timestamp.now()
+                start_date = end_date - pd.DateOffset(months=2)
 
-            # Download data with verbose output
-            self.data = yf.download(self.ticker, start=start_date, end=end_date, progress=False)
+                # Download data with verbose output
+                data = fetch_cached(self.ticker, start_date, end_date)
+            self.data = data.copy()
 
             # Print initial data diagnostics
             print("\n--- DATA OVERVIEW ---")
@@ -48,8 +57,8 @@ class FibonacciStockIndicator:
         Calculate Fibonacci retracement levels with comprehensive analysis
         """
         # Use robust method to find high and low
-        high = float(self.data['High'].max())
-        low = float(self.data['Low'].min())
+        high = float(self.data['High'].to_numpy().max())
+        low = float(self.data['Low'].to_numpy().min())
 
         # Print Fibonacci level diagnostics
         print("\n--- FIBONACCI LEVELS ---")
@@ -57,14 +66,9 @@ class FibonacciStockIndicator:
         print(f"Lowest price: {low}")
 
         # Fibonacci retracement levels
-        levels = {
-            '0%': high,
-            '23.6%': high - 0.236 * (high - low),
-            '38.2%': high - 0.382 * (high - low),
-            '50%': high - 0.5 * (high - low),
-            '61.8%': high - 0.618 * (high - low),
-            '100%': low
-        }
+        ratios = np.array([0.0, 0.236, 0.382, 0.5, 0.618, 1.0])
+        prices = high - ratios * (high - low)
+        levels = dict(zip(['0%', '23.6%', '38.2%', '50%', '61.8%', '100%'], prices.tolist()))
 
         # Print detailed Fibonacci levels
         for level, price in levels.items():
@@ -77,13 +81,12 @@ class FibonacciStockIndicator:
         Generate comprehensive trading signals
         """
         # Calculate multiple moving averages for robust analysis
-        self.data['SMA_10'] = self.data['Close'].rolling(window=10).mean()
-        self.data['SMA_30'] = self.data['Close'].rolling(window=30).mean()
+        close = self.data['Close'].to_numpy(dtype=np.float64)
+        self.data['SMA_10'], self.data['SMA_30'] = sma_np(close, (10, 30))
 
         # Initialize signals DataFrame
         signals = pd.DataFrame(index=self.data.index)
         signals['Close'] = self.data['Close']
-        signals['Signal'] = 0
 
         # Advanced crossover signal generation
         # Buy signal: 10-day MA crosses above 30-day MA
@@ -98,9 +101,8 @@ class FibonacciStockIndicator:
                 (self.data['SMA_10'].shift(1) >= self.data['SMA_30'].shift(1))
         )
 
-        # Apply signals
-        signals.loc[buy_signal, 'Signal'] = 1
-        signals.loc[sell_signal, 'Signal'] = -1
+        # Apply signals as one column write rather than in-place .loc updates
+        signals['Signal'] = np.select([buy_signal, sell_signal], [1, -1], 0)
 
         # Print signal diagnostics
         print("\n--- TRADING SIGNALS ---")
@@ -111,9 +113,9 @@ class FibonacciStockIndicator:
 
         return signals
 
-    def plot_fibonacci_chart(self):
+    def plot_fibonacci_chart(self, out_path=None):
         """
-        Create comprehensive stock chart with detailed visualization
+        Create comprehensive stock chart with detailed visualization, saved to out_path instead of shown if given
         """
         # Calculate Fibonacci levels
         fib_levels = self.calculate_fibonacci_levels()
@@ -121,32 +123,34 @@ class FibonacciStockIndicator:
         # Generate signals
         signals = self.generate_trading_signals()
 
+        import matplotlib.pyplot as plt
+
         # Create plot with improved readability
-        plt.figure(figsize=(20, 10))
+        fig = plt.figure(figsize=(20, 10))
         plt.title(f'{self.ticker} Stock Analysis with Fibonacci Levels', fontsize=16)
 
         # Plot price with increased line width
         plt.plot(self.data.index, self.data['Close'], label='Close Price', color='black', linewidth=2)
 
-        # Plot Fibonacci levels with improved visibility
-        for level, price in fib_levels.items():
-            plt.axhline(y=price, color='blue', linestyle='--', alpha=0.7,
-                        label=f'Fib {level}: {price:.2f}')
+        # Plot all Fibonacci levels as a single line collection with one legend entry
+        plt.hlines(list(fib_levels.values()), self.data.index[0], self.data.index[-1],
+                   colors='blue', linestyles='--', alpha=0.7, label='Fibonacci Levels')
 
         # Plot buy/sell signals
         buy_signals = signals[signals['Signal'] == 1]
         sell_signals = signals[signals['Signal'] == -1]
 
         plt.scatter(buy_signals.index, buy_signals['Close'],
-                    color='green', marker='^', label='Buy Signal', s=100)
+                    color='green', marker='^', label='Buy Signal', s=100, edgecolors='none', rasterized=True)
         plt.scatter(sell_signals.index, sell_signals['Close'],
-                    color='red', marker='v', label='Sell Signal', s=100)
+                    color='red', marker='v', label='Sell Signal', s=100, edgecolors='none', rasterized=True)
 
         # Annotate dates with closing prices
-        for idx, row in self.data.iterrows():
-            close_price = float(row['Close'])
+        dates = self.data.index.to_numpy()
+        prices = self.data['Close'].to_numpy()
+        for date, close_price in zip(dates, prices):
             plt.annotate(f'${close_price:.2f}',
-                         (idx, close_price),
+                         (date, close_price),
                          xytext=(10, 5),
                          textcoords='offset points',
                          fontsize=8,
@@ -157,7 +161,7 @@ class FibonacciStockIndicator:
         plt.ylabel('Price', fontsize=12)
         plt.grid(True, linestyle='--', alpha=0.7)
         plt.tight_layout()
-        plt.show()
+        finish_chart(fig, out_path)
 
 
 def main():
@@ -167,7 +171,7 @@ def main():
     try:
         # Create and plot Fibonacci indicator
         indicator = FibonacciStockIndicator(ticker)
-        indicator.plot_fibonacci_chart()
+        indicator.plot_fibonacci_chart(batch_chart_path(f"{ticker}_fibonacci.png"))
     except Exception as e:
         print(f"Error processing {ticker}: {e}")
 
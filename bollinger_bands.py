@@ -1,31 +1,31 @@
 import numpy as np
 import pandas as pd
-import yfinance as yf
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import argparse
+from core import bbands_np
+from market_data import batch_chart_path, fetch_cached, finish_chart
 
-def bollinger_bands(ticker, start_date, end_date, period= 20, k = 2):
-    data = yf.download(ticker, start = start_date, end = end_date, progress =False)
+def bollinger_bands(ticker, start_date, end_date, period= 20, k = 2, out_path=None):
+    data = fetch_cached(ticker, start_date, end_date).dropna(subset=['Close'])
     if data.empty:
         print("No data found for the given ticker or date range")
         return 
-    data['SMA'] = data['Close'].rolling(window=period).mean()
-    data['STD'] = data['Close'].rolling(window=period).std()
-    data['Upper Band'] = data['SMA'] + (k * data['STD'])
-    data['Lower Band'] = data['SMA'] - (k * data['STD'])
-    plt.figure(figsize=(14, 7))
-    plt.plot(data.index, data['Close'], label=f'{ticker} Closing Price', color='blue')
-    plt.plot(data.index, data['SMA'], label=f'{period}-Day SMA', color='orange', linestyle='--')
-    plt.plot(data.index, data['Upper Band'], label='Upper Band (+2 SD)', color='green', linestyle='--')
-    plt.plot(data.index, data['Lower Band'], label='Lower Band (-2 SD)', color='red', linestyle='--')
-    plt.fill_between(data.index, data['Lower Band'], data['Upper Band'], color='gray', alpha=0.2)
+    data['Close'] = data['Close'].astype(np.float32)
+    sma, upper, lower = bbands_np(data['Close'].to_numpy(), period, k, dtype=np.float32)
+    import matplotlib.pyplot as plt
+    dates = data.index.to_numpy()
+    fig = plt.figure(figsize=(14, 7))
+    plt.plot(dates, data['Close'].to_numpy(), label=f'{ticker} Closing Price', color='blue', rasterized=True)
+    plt.plot(dates, sma, label=f'{period}-Day SMA', color='orange', linestyle='--', rasterized=True)
+    plt.plot(dates, upper, label='Upper Band (+2 SD)', color='green', linestyle='--', rasterized=True)
+    plt.plot(dates, lower, label='Lower Band (-2 SD)', color='red', linestyle='--', rasterized=True)
+    plt.fill_between(dates, lower, upper, color='gray', alpha=0.2)
     plt.title(f"Bollinger Bands for {ticker}")
     plt.xlabel("Date")
     plt.ylabel("Price")
     plt.legend(loc="upper left")
     plt.grid()
-    plt.show()
+    finish_chart(fig, out_path)
 def main():
     parser = argparse.ArgumentParser(description="Calculate and plot Bollinger Bands for a stock.")
     parser.add_argument("ticker", type=str, help="The stock ticker symbol (e.g., AAPL, MSFT).")
@@ -33,8 +33,10 @@ def main():
     parser.add_argument("end_date", type=str, help="End date for historical data (YYYY-MM-DD).")
     parser.add_argument("--period", type=int, default=20, help="Lookback period for the SMA (default: 20).")
     parser.add_argument("--k", type=float, default=2, help="Multiplier for standard deviation (default: 2).")
+    parser.add_argument("--out", type=str, default=None, help="Save the chart to this file instead of showing it.")
     args = parser.parse_args()
-    bollinger_bands(args.ticker, args.start_date, args.end_date, args.period, args.k)
+    out_path = args.out or batch_chart_path(f"{args.ticker}_bollinger_bands.png")
+    bollinger_bands(args.ticker, args.start_date, args.end_date, args.period, args.k, out_path)
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,45 @@
+"""
+Ahead-of-time compile the numba kernels from core.py.
+
+Run ``python compile_kernels.py`` once to build the ``ts_kernels`` extension module
+next to this file. core.py imports it when present, which removes the JIT warm-up on
+every run and no longer needs numba at runtime.
+"""
+import os
+
+from numba.pycc import CC
+
+from core import _bbands, _macd_kernel, _sma_kernel, _wilder_smooth
+
+cc = CC('ts_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+@cc.export('macd_12_26_9', 'Tuple((f8[:], f8[:], b1[:], b1[:]))(f8[:])')
+def macd_12_26_9(close):
+    # Literal smoothing factors let LLVM fold them into the inlined kernel
+    return _macd_kernel(close, 2 / 13.0, 2 / 27.0, 2 / 10.0)
+
+
+# The indicator kernels are exported once per input dtype as <name>_f4 / <name>_f8,
+# so the float32 closes that the strategies pass in need no conversion
+def wilder_smooth(x, period):
+    return _wilder_smooth(x, period)
+
+
+def sma(x, windows):
+    return _sma_kernel(x, windows)
+
+
+def bbands(close, period, k):
+    return _bbands(close, period, k)
+
+
+for ty in ('f4', 'f8'):
+    cc.export(f'wilder_smooth_{ty}', f'f8[:]({ty}[:], i8)')(wilder_smooth)
+    cc.export(f'sma_{ty}', f'f8[:, :]({ty}[:], i8[:])')(sma)
+    cc.export(f'bbands_{ty}', f'UniTuple(f8[:], 3)({ty}[:], i8, f8)')(bbands)
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,328 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba is optional; kernels then run as plain Python
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+try:
+    # Built by compile_kernels.py; rebuild it after changing any kernel it exports
+    import ts_kernels
+except ImportError:
+    ts_kernels = None
+
+
+def _aot_kernel(name, x):
+    """Return the ahead-of-time build of kernel `name` for the float dtype of x, or None if it was not built."""
+    if x.dtype.kind != 'f':
+        return None
+    return getattr(ts_kernels, f'{name}_f{x.dtype.itemsize}', None)
+
+
+@njit(cache=True)
+def _ema_kernel(x, alphas):
+    out = np.empty((alphas.size, x.size))
+    if x.size == 0:
+        return out
+
+    state = np.full(alphas.size, x[0])
+    out[:, 0] = state
+    for i in range(1, x.size):
+        for j in range(alphas.size):
+            state[j] += alphas[j] * (x[i] - state[j])
+            out[j, i] = state[j]
+    return out
+
+
+def _ema_cumsum(x, alphas, block):
+    out = np.empty((alphas.size, x.size))
+    if x.size == 0:
+        return out
+    alpha = alphas[:, None]
+    beta = 1.0 - alpha
+
+    # Closed form of the recursion over a block that starts after a known state s:
+    #   s_j = beta^j * (s + alpha * sum_{k<=j} x_k * beta^-k)
+    # Restarting every `block` samples keeps beta^-k from overflowing on long series.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decay = beta ** np.arange(1, block + 1)
+        inv = 1.0 / decay
+
+        out[:, 0] = x[0]
+        for start in range(1, x.size, block):
+            chunk = x[start:start + block]
+            m = chunk.size
+            out[:, start:start + m] = decay[:, :m] * (
+                out[:, start - 1:start] + alpha * np.cumsum(chunk * inv[:, :m], axis=1))
+
+    # A span of 1 has no memory, and the closed form would divide by zero
+    out[beta[:, 0] == 0.0] = x
+    return out
+
+
+def ema_np(x, span, block=512):
+    """Exponential moving average of a NaN-free 1-D array, matching ewm(span=span, adjust=False).mean().
+
+    Passing a sequence of spans computes every EMA in the same pass and returns one row per span.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    alphas = 2.0 / (np.atleast_1d(np.asarray(span, dtype=np.float64)) + 1)
+    if HAS_NUMBA:
+        out = _ema_kernel(x, alphas)
+    else:
+        out = _ema_cumsum(x, alphas, block)
+    return out if np.ndim(span) else out[0]
+
+
+def crossovers(diff, level):
+    """Flag bars where diff crosses above zero below the zero line, and below zero above it."""
+    # Work on one-byte sign masks instead of a float64 lagged copy of diff
+    above = diff > 0
+    below = diff < 0
+    buy = np.zeros(diff.shape, dtype=bool)
+    sell = np.zeros(diff.shape, dtype=bool)
+    buy[1:] = above[1:] & ~above[:-1] & (level[1:] < 0)
+    sell[1:] = below[1:] & ~below[:-1] & (level[1:] > 0)
+    return buy, sell
+
+
+def cross_signals(fast, slow):
+    """Return the int8 state of fast above slow and its change: +1 on upward crosses, -1 on downward ones."""
+    # NaN warm-up rows compare False, so they hold no position
+    signal = (np.asarray(fast) > np.asarray(slow)).astype(np.int8)
+    crossover = np.zeros_like(signal)
+    np.subtract(signal[1:], signal[:-1], out=crossover[1:])
+    return signal, crossover
+
+
+def cross_indices(signal):
+    """Return the bar indices where a 0/1 signal switches on (buys) and off (sells)."""
+    mask = np.asarray(signal, dtype=np.uint8)
+    # XOR of neighbouring one-byte states flags every switch, and the new state gives its direction
+    changes = np.zeros_like(mask)
+    np.bitwise_xor(mask[1:], mask[:-1], out=changes[1:])
+    return np.flatnonzero(changes & mask), np.flatnonzero(changes & (mask ^ 1))
+
+
+@njit(cache=True)
+def _macd_kernel(close, a_fast, a_slow, a_signal):
+    n = close.size
+    macd = np.empty(n)
+    signal = np.empty(n)
+    buy = np.zeros(n, dtype=np.bool_)
+    sell = np.zeros(n, dtype=np.bool_)
+    if n == 0:
+        return macd, signal, buy, sell
+
+    e_fast = close[0]
+    e_slow = close[0]
+    e_signal = 0.0
+    prev = 0.0
+    for i in range(n):
+        e_fast += a_fast * (close[i] - e_fast)
+        e_slow += a_slow * (close[i] - e_slow)
+        d = e_fast - e_slow
+        e_signal += a_signal * (d - e_signal)
+        macd[i] = d
+        signal[i] = e_signal
+
+        diff = d - e_signal
+        if i > 0:
+            buy[i] = diff > 0 and prev <= 0 and d < 0
+            sell[i] = diff < 0 and prev >= 0 and d > 0
+        prev = diff
+    return macd, signal, buy, sell
+
+
+def macd_np(close, fast=12, slow=26, signal=9):
+    """Return the MACD line, signal line and buy/sell crossover masks in a single pass over a NaN-free close."""
+    close = np.asarray(close, dtype=np.float64)
+    macd_12_26_9 = getattr(ts_kernels, 'macd_12_26_9', None)
+    if macd_12_26_9 is not None and (fast, slow, signal) == (12, 26, 9):
+        return macd_12_26_9(close)
+    if HAS_NUMBA:
+        return _macd_kernel(close, 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1))
+
+    fast_ema, slow_ema = ema_np(close, (fast, slow))
+    macd = fast_ema - slow_ema
+    sig = ema_np(macd, signal)
+    buy, sell = crossovers(macd - sig, macd)
+    return macd, sig, buy, sell
+
+
+@njit(cache=True)
+def _sma_kernel(x, windows):
+    n = x.size
+    out = np.full((windows.size, n), np.nan)
+    sums = np.zeros(windows.size)
+    for i in range(n):
+        for j in range(windows.size):
+            w = windows[j]
+            sums[j] += x[i]
+            if i >= w:
+                sums[j] -= x[i - w]
+            if i >= w - 1:
+                out[j, i] = sums[j] / w
+    return out
+
+
+def sma_np(x, window, dtype=np.float64):
+    """Simple moving average of a NaN-free 1-D array, matching rolling(window).mean().
+
+    Passing a sequence of windows computes every average in the same pass and returns one row per window.
+    The input is read as `dtype`; with np.float32 it moves half the bytes, while the running sums
+    and the result stay float64.
+    """
+    x = np.asarray(x, dtype=dtype)
+    windows = np.atleast_1d(np.asarray(window, dtype=np.int64))
+    kernel = _aot_kernel('sma', x) or (_sma_kernel if HAS_NUMBA else None)
+    if kernel is not None:
+        out = kernel(x, windows)
+    else:
+        out = np.full((windows.size, x.size), np.nan)
+        csum = np.cumsum(x, dtype=np.float64)
+        for row, w in zip(out, windows):
+            if x.size >= w:
+                row[w - 1:] = csum[w - 1:]
+                row[w:] -= csum[:-w]
+                row[w - 1:] /= w
+    return out if np.ndim(window) else out[0]
+
+
+@njit(cache=True)
+def _wilder_smooth(x, period):
+    n = x.size
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+
+    # Seed with the simple mean of the first `period` values after the leading NaN
+    avg = 0.0
+    for i in range(1, period + 1):
+        avg += x[i]
+    avg /= period
+    out[period] = avg
+
+    for i in range(period + 1, n):
+        avg = (avg * (period - 1) + x[i]) / period
+        out[i] = avg
+    return out
+
+
+def _wilder_lfilter(x, period):
+    out = np.full(x.size, np.nan)
+    if x.size <= period:
+        return out
+
+    # Wilder smoothing is the IIR filter y[n] = a * x[n] + (1 - a) * y[n-1] with a = 1 / period,
+    # seeded with the simple mean of the first `period` values after the leading NaN
+    alpha = 1.0 / period
+    seed = x[1:period + 1].mean(dtype=np.float64)
+    out[period] = seed
+    tail = np.asarray(x[period + 1:], dtype=np.float64)
+    out[period + 1:], _ = lfilter([alpha], [1.0, alpha - 1.0], tail, zi=[seed * (1.0 - alpha)])
+    return out
+
+
+def rsi_np(close, period=14, dtype=np.float64):
+    """Wilder's RSI of a NaN-free 1-D close array read as `dtype`; the first `period` values are NaN."""
+    close = np.asarray(close, dtype=dtype)
+    delta = np.empty_like(close)
+    delta[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = np.maximum(delta, 0.0)
+    loss = np.maximum(-delta, 0.0)
+
+    # Without numba the kernel would run as a Python loop, so prefer scipy's C filter when present
+    smooth = _aot_kernel('wilder_smooth', gain)
+    if smooth is None:
+        smooth = _wilder_smooth if HAS_NUMBA or lfilter is None else _wilder_lfilter
+    avg_gain = smooth(gain, period)
+    avg_loss = smooth(loss, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi[avg_loss == 0.0] = 100.0
+    return rsi
+
+
+@njit(cache=True)
+def _bbands(close, period, k):
+    n = close.size
+    sma = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+
+    # Welford running mean and sum of squared deviations, slid one bar at a time
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        x = close[i]
+        if i < period:
+            delta = x - mean
+            mean += delta / (i + 1)
+            m2 += delta * (x - mean)
+        elif i % period == 0:
+            # Rebuild the window exactly once per period so sliding rounding errors cannot pile up
+            mean = 0.0
+            for j in range(i - period + 1, i + 1):
+                mean += close[j]
+            mean /= period
+            m2 = 0.0
+            for j in range(i - period + 1, i + 1):
+                m2 += (close[j] - mean) * (close[j] - mean)
+        else:
+            old = close[i - period]
+            new_mean = mean + (x - old) / period
+            m2 += (x - old) * (x - new_mean + old - mean)
+            mean = new_mean
+
+        if i >= period - 1:
+            # Sample standard deviation, as rolling(period).std() reports
+            std = np.sqrt(max(m2 / (period - 1), 0.0)) if period > 1 else np.nan
+            sma[i] = mean
+            upper[i] = mean + k * std
+            lower[i] = mean - k * std
+    return sma, upper, lower
+
+
+def _bbands_windowed(close, period, k):
+    n = close.size
+    sma = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    if n < period:
+        return sma, upper, lower
+
+    # Shift by the overall mean first so E[x^2] - E[x]^2 does not cancel away the variance of price-sized values
+    shift = close.mean(dtype=np.float64)
+    windows = sliding_window_view(close.astype(np.float64) - shift, period)
+    mean = windows.mean(axis=1)
+    var = (windows * windows).mean(axis=1) - mean * mean
+    # Rescale the population variance to the sample variance that rolling(period).std() reports
+    std = np.sqrt(np.maximum(var, 0.0) * period / (period - 1)) if period > 1 else np.full(mean.size, np.nan)
+
+    mean += shift
+    sma[period - 1:] = mean
+    upper[period - 1:] = mean + k * std
+    lower[period - 1:] = mean - k * std
+    return sma, upper, lower
+
+
+def bbands_np(close, period=20, k=2.0, dtype=np.float64):
+    """Bollinger Bands of a NaN-free 1-D close array read as `dtype`, returned as float64 (sma, upper, lower)."""
+    close = np.asarray(close, dtype=dtype)
+    # Without numba the Welford kernel would run as a Python loop, so reduce over a strided window view instead
+    bbands = _aot_kernel('bbands', close) or (_bbands if HAS_NUMBA else _bbands_windowed)
+    return bbands(close, period, float(k))
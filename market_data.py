@@ -0,0 +1,113 @@
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+
+# Copy-on-Write is always on from pandas 3.0; opt in on 2.x so column writes skip defensive copies
+if pd.__version__.startswith('2.'):
+    pd.set_option('mode.copy_on_write', True)
+
+CACHE_DIR = Path('~/.cache/trading').expanduser()
+CACHE_TTL = 24 * 60 * 60  # seconds a cached range that reaches today stays fresh
+BATCH = os.environ.get('BATCH') == '1'  # batch runs write chart files instead of opening windows
+
+
+def fetch_prices(tickers, start, end):
+    """Download several tickers in one batched request and return a {ticker: DataFrame} dict."""
+    tickers = list(tickers)
+    data = yf.download(tickers, start=start, end=end, group_by='ticker', threads=True, progress=False)
+    # Tickers trading on different calendars share one index, so drop the rows padded in for the others
+    return {ticker: data[ticker].dropna(how='all') for ticker in tickers}
+
+
+def fetch_cached(ticker, start, end):
+    """Download a single ticker, reusing the on-disk copy of an identical earlier request."""
+    # yf.download reads a missing start as the earliest bar and a missing end as today
+    start_key = 'first' if start is None else pd.Timestamp(start).strftime('%Y-%m-%d')
+    end_ts = pd.Timestamp.today() if end is None else pd.Timestamp(end)
+    end_key = end_ts.strftime('%Y-%m-%d')
+    key = hashlib.md5(f"{ticker}|{start_key}|{end_key}".encode()).hexdigest()
+    path = CACHE_DIR / f"{key}.parquet"
+
+    if path.exists():
+        # A range reaching today can still gain bars, so only trust it for a day
+        is_open = end_ts.normalize() >= pd.Timestamp.today().normalize()
+        if not is_open or time.time() - path.stat().st_mtime < CACHE_TTL:
+            try:
+                return pd.read_parquet(path)
+            except Exception:  # unreadable cache file, so download again and overwrite it below
+                pass
+
+    data = yf.download(ticker, start=start, end=end, progress=False)
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    if not data.empty:
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write next to the target and rename it into place, so readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            os.close(fd)
+            data.to_parquet(tmp)
+            os.replace(tmp, path)
+        except (ImportError, OSError, ValueError):  # no parquet engine or an unwritable cache, so run uncached
+            pass
+        finally:
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+    return data
+
+
+def batch_chart_path(name):
+    """Return the file a BATCH=1 run saves its chart to, selecting the Agg backend, or None to show the chart."""
+    if not BATCH:
+        return None
+    # Must run before pyplot is first imported, which the plot functions defer until they draw
+    import matplotlib
+    matplotlib.use('Agg')
+    return name
+
+
+def finish_chart(fig, out_path=None):
+    """Save fig to out_path and close it, or show it interactively when no path is given."""
+    import matplotlib.pyplot as plt
+    if out_path is None:
+        plt.show()
+        return
+    fig.savefig(out_path, dpi=96)
+    plt.close(fig)
+    print(f"Saved chart to {out_path}")
+
+
+class FrameLoaderMixin:
+    """Alternate constructors for strategies that accept a pre-downloaded price frame as data=."""
+
+    @classmethod
+    def from_frame(cls, ticker, frame, **kwargs):
+        """Build the strategy on an already downloaded price frame, skipping the fetch."""
+        return cls(ticker, frame.index.min(), frame.index.max(), data=frame, **kwargs)
+
+    @classmethod
+    def bulk(cls, tickers, start, end, **kwargs):
+        """Build one strategy per ticker from a single batched download and return a {ticker: strategy} dict."""
+        frames = fetch_prices(tickers, start, end)
+        return {ticker: cls.from_frame(ticker, frame, **kwargs) for ticker, frame in frames.items()}
+
+
+def run_many(cls, tickers, start, end, max_workers=8, executor=ThreadPoolExecutor, **kwargs):
+    """
+    Build cls(ticker, start, end, **kwargs) for every ticker concurrently and return a {ticker: strategy} dict.
+
+    Construction is dominated by downloads that release the GIL, so threads scale with the number
+    of tickers up to max_workers. Pass executor=ProcessPoolExecutor to spread indicator work over
+    cached data across cores instead. Plot the results afterwards on the main thread, as pyplot is
+    not thread-safe.
+    """
+    with executor(max_workers=max_workers) as pool:
+        futures = {pool.submit(cls, ticker, start, end, **kwargs): ticker for ticker in tickers}
+        return {futures[future]: future.result() for future in as_completed(futures)}